@@ -3,17 +3,287 @@ Ads Fetcher - Python wrapper for TypeScript/Node.js ads fetching module
 For Railway/Production Deployment
 """
 import os
+import selectors
+import shutil
+import signal
 import subprocess
 import sys
 import json
+import logging
+import queue
+import threading
 import time
 import re
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
-from typing import Tuple, Optional, Dict, Any
+from typing import Tuple, Optional, Dict, Any, Callable, List
+
+# Ads count reported by the Node.js output, compiled once at import.
+# Each alternative captures the count in its own group. The pattern is
+# bytes so raw pipe output can be scanned without decoding it first.
+_ADS_COUNT_RE = re.compile(
+    rb'(?:fetched\s+(\d+)\s+ads'
+    rb'|ads_fetched[:\s]+(\d+)'
+    rb'|Found\s+(\d+)\s+ads'
+    rb'|Total ads:\s*(\d+)'
+    rb'|saved\s+(\d+)\s+ads'
+    rb'|processed\s+(\d+)\s+ads)',
+    re.IGNORECASE
+)
+
+def _match_ads_count(match: re.Match) -> int:
+    """Return the count captured by whichever _ADS_COUNT_RE alternative matched"""
+    return next(int(group) for group in match.groups() if group is not None)
+
+# Final stdout line printed by src/index.ts, e.g. __ADS_RESULT__{"count": 42}
+RESULT_SENTINEL = b'__ADS_RESULT__'
+RESULT_TAIL_LINES = 10
+
+def read_result_sentinel(stdout_lines: List[bytes]) -> Optional[int]:
+    """
+    Get the ads count from the result sentinel near the end of stdout
+    
+    Args:
+        stdout_lines: Raw stdout lines
+    
+    Returns:
+        Number of ads Node.js reported (which may be 0), or None if no
+        valid sentinel line was printed
+    """
+    for line in reversed(stdout_lines[-RESULT_TAIL_LINES:]):
+        if line.startswith(RESULT_SENTINEL):
+            try:
+                return int(json.loads(line[len(RESULT_SENTINEL):])['count'])
+            except (ValueError, KeyError, TypeError):
+                return None
+    return None
+
+def scan_ads_count(*outputs: bytes) -> int:
+    """
+    Find the largest ads count mentioned in free-form Node.js output
+    
+    Only used for builds that don't print the result sentinel.
+    
+    Args:
+        outputs: Raw output streams to scan
+    
+    Returns:
+        Number of ads found, or 0 if none was mentioned
+    """
+    ads_count = 0
+    for output in outputs:
+        for match in _ADS_COUNT_RE.finditer(output):
+            ads_count = max(ads_count, _match_ads_count(match))
+    return ads_count
+
+def kill_process_group(process: subprocess.Popen):
+    """Kill a child started with start_new_session=True, plus anything it spawned"""
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except (AttributeError, OSError):
+        process.kill()
+    process.wait()
+
+def stream_process(process: subprocess.Popen, timeout: float,
+                   on_line: Optional[Callable[[bytes], None]] = None) -> Tuple[bytes, bytes, Optional[int]]:
+    """
+    Read a child's stdout and stderr line by line until it exits
+    
+    Both pipes are multiplexed with a selector so neither can fill up and
+    block the child. Reads go straight to the file descriptors with
+    os.read, so a line without a newline can't block past the timeout;
+    lines are split here. The ads count is read from the result sentinel
+    once the child has exited (see read_result_sentinel).
+    
+    Args:
+        process: Popen started with binary stdout/stderr pipes
+        timeout: Maximum time in seconds to wait for the process
+        on_line: Optional callback invoked with every raw output line
+    
+    Returns:
+        Tuple of (stdout, stderr, ads_count) with the output left undecoded;
+        ads_count is None if the child printed no result sentinel
+    
+    Raises:
+        subprocess.TimeoutExpired: If the process outlives the timeout (it is killed)
+    """
+    deadline = time.monotonic() + timeout
+    stdout_fd, stderr_fd = process.stdout.fileno(), process.stderr.fileno()
+    output = {stdout_fd: [], stderr_fd: []}
+    # Bytes after the last newline seen on each pipe
+    partial = {stdout_fd: b'', stderr_fd: b''}
+    
+    with selectors.DefaultSelector() as selector:
+        selector.register(stdout_fd, selectors.EVENT_READ)
+        selector.register(stderr_fd, selectors.EVENT_READ)
+        
+        while selector.get_map():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                kill_process_group(process)
+                raise subprocess.TimeoutExpired(process.args, timeout)
+            
+            for key, _ in selector.select(remaining):
+                fd = key.fd
+                chunk = os.read(fd, 65536)
+                if not chunk:
+                    # EOF: keep a trailing line that had no newline
+                    selector.unregister(fd)
+                    lines = [partial[fd]] if partial[fd] else []
+                    partial[fd] = b''
+                else:
+                    pieces = (partial[fd] + chunk).split(b'\n')
+                    partial[fd] = pieces.pop()
+                    lines = [piece + b'\n' for piece in pieces]
+                
+                output[fd].extend(lines)
+                if on_line is not None:
+                    for line in lines:
+                        on_line(line)
+    
+    try:
+        process.wait(timeout=max(0, deadline - time.monotonic()))
+    except subprocess.TimeoutExpired:
+        kill_process_group(process)
+        raise subprocess.TimeoutExpired(process.args, timeout)
+    
+    stdout_lines, stderr_lines = output[stdout_fd], output[stderr_fd]
+    return b''.join(stdout_lines), b''.join(stderr_lines), read_result_sentinel(stdout_lines)
+
+_log = logging.getLogger(__name__)
+
+# Prefix the Node.js worker puts on its result lines (see src/worker.ts)
+WORKER_RESULT_PREFIX = '__ADS_WORKER__'
+
+# Shared pool so API handlers can fan out fetches without blocking
+_fetch_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='ads-fetch')
+
+class WorkerUnavailable(Exception):
+    """The Node.js worker died or stopped reading before returning a result"""
+
+class NodeWorker:
+    """Long-lived Node.js process that runs fetch jobs sent over stdin"""
+    
+    def __init__(self, cmd: list, cwd: str, env: Dict[str, str]):
+        """
+        Start the worker process
+        
+        Args:
+            cmd: Command that starts src/worker.ts
+            cwd: Directory to run it in
+            env: Environment for the Node.js process
+        """
+        self.process = subprocess.Popen(
+            cmd,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            encoding='utf-8',
+            errors='replace',
+            bufsize=1,
+            env=env,
+            cwd=cwd,
+            start_new_session=True
+        )
+        
+        # Held by the caller for the whole job; the worker runs one job at a time
+        self.lock = threading.Lock()
+        
+        # A reader thread drains stdout so a job can wait on it with a timeout
+        self._lines: queue.Queue = queue.Queue()
+        self._reader = threading.Thread(target=self._read_output, daemon=True)
+        self._reader.start()
+    
+    def _read_output(self):
+        try:
+            for line in self.process.stdout:
+                self._lines.put(line)
+        except (OSError, ValueError) as e:
+            _log.warning("Node.js worker output reader stopped: %s", e)
+        finally:
+            # Always signal the end so a waiting job falls back instead of timing out
+            self._lines.put(None)
+    
+    def is_alive(self) -> bool:
+        return self.process.poll() is None
+    
+    def kill(self):
+        """Stop the worker (and anything it spawned)"""
+        if self.is_alive():
+            kill_process_group(self.process)
+    
+    def run_job(self, user_id: str, platform: str, timeout: float) -> Tuple[bool, str, int]:
+        """
+        Send one job to the worker and wait for its result line
+        
+        The caller must hold self.lock.
+        
+        Args:
+            user_id: The user ID to fetch ads for
+            platform: Which platform to fetch from
+            timeout: Maximum time in seconds to wait for the result
+        
+        Returns:
+            Tuple of (success, output, ads_count)
+        
+        Raises:
+            subprocess.TimeoutExpired: If no result arrives in time (the worker is killed)
+            WorkerUnavailable: If the job could not be sent or the worker exited without a result
+        """
+        job_id = uuid.uuid4().hex
+        job = json.dumps({'job_id': job_id, 'user_id': user_id, 'platform': platform})
+        
+        try:
+            self.process.stdin.write(job + '\n')
+            self.process.stdin.flush()
+        except OSError as e:
+            self.kill()
+            raise WorkerUnavailable(f"Node.js worker is not accepting jobs: {e}")
+        
+        deadline = time.monotonic() + timeout
+        output = []
+        
+        while True:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining <= 0:
+                    raise queue.Empty
+                line = self._lines.get(timeout=remaining)
+            except queue.Empty:
+                self.kill()
+                raise subprocess.TimeoutExpired(self.process.args, timeout)
+            
+            if line is None:
+                raise WorkerUnavailable("Node.js worker exited unexpectedly\n" + ''.join(output))
+            
+            if line.startswith(WORKER_RESULT_PREFIX):
+                try:
+                    result = json.loads(line[len(WORKER_RESULT_PREFIX):])
+                except ValueError:
+                    output.append(line)
+                    continue
+                
+                if result.get('job_id') == job_id and result.get('done'):
+                    if result.get('error'):
+                        output.append(f"Error: {result['error']}\n")
+                    return bool(result.get('ok')), ''.join(output), int(result.get('ads') or 0)
+                continue
+            
+            output.append(line)
 
 class AdsFetcher:
     """Python interface to run the TypeScript ads fetching module"""
     
+    # Node.js/npm versions don't change for the life of the interpreter,
+    # so they are probed once and shared by every instance
+    _env_cache: Optional[Tuple[bool, str, str, str]] = None
+    _env_lock = threading.Lock()
+    
+    # Consecutive worker failures after which fetches stop trying the worker
+    WORKER_MAX_FAILURES = 3
+    
     def __init__(self, timeout: int = None):
         """
         Initialize the ads fetcher
@@ -40,33 +310,149 @@ class AdsFetcher:
                 self.timeout = timeout or Config.ADS_FETCH_TIMEOUT
                 self.ads_fetch_dir = Config.ADS_FETCH_DIR
                 self.node_script = Config.NODE_SCRIPT
+                self.worker_script = Config.NODE_WORKER_SCRIPT
                 
-                print(f"✅ Loaded config: {config_path}")
-                print(f"   - Timeout: {self.timeout}s")
-                print(f"   - Directory: {self.ads_fetch_dir}")
-                print(f"   - Script: {self.node_script}")
+                _log.info("Loaded config: %s (timeout=%ss, directory=%s, script=%s)",
+                          config_path, self.timeout, self.ads_fetch_dir, self.node_script)
             else:
                 # Use defaults relative to project structure
                 self.ads_fetch_dir = os.path.join(project_root, 'src')
                 self.node_script = 'npm start'
-                print(f"⚠️  Config not found at {config_path}, using defaults")
+                self.worker_script = os.getenv('NODE_WORKER_SCRIPT', 'npm run --silent worker')
+                _log.warning("Config not found at %s, using defaults", config_path)
                 
         except ImportError as e:
-            print(f"❌ Config import error: {e}")
+            _log.error("Config import error: %s", e)
             # Use safe defaults
             current_dir = os.path.dirname(os.path.abspath(__file__))
             project_root = os.path.dirname(os.path.dirname(current_dir))
             self.ads_fetch_dir = os.path.join(project_root, 'src')
             self.node_script = 'npm start'
+            self.worker_script = os.getenv('NODE_WORKER_SCRIPT', 'npm run --silent worker')
         
         # Ensure directory exists
         if not os.path.exists(self.ads_fetch_dir):
-            print(f"⚠️  Warning: Ads fetch directory does not exist: {self.ads_fetch_dir}")
+            _log.warning("Ads fetch directory does not exist: %s", self.ads_fetch_dir)
             # Try alternative location
             alternative_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'src')
             if os.path.exists(alternative_dir):
-                print(f"   Using alternative: {alternative_dir}")
+                _log.warning("Using alternative ads fetch directory: %s", alternative_dir)
                 self.ads_fetch_dir = alternative_dir
+        
+        # Directory layout and script never change at runtime, so check them once
+        self.refresh()
+        
+        # Long-lived Node.js worker, started lazily on the first fetch
+        self._worker: Optional[NodeWorker] = None
+        self._worker_lock = threading.Lock()
+        self._worker_failures = 0
+    
+    def refresh(self):
+        """
+        Re-check the ads fetch directory and re-resolve the command
+        
+        Both are cached at startup; call this after changing the directory
+        or its package.json at runtime (e.g. in tests).
+        """
+        self._dir_exists = os.path.isdir(self.ads_fetch_dir)
+        self._package_json_exists = self._dir_exists and \
+            os.path.isfile(os.path.join(self.ads_fetch_dir, 'package.json'))
+        self._node_modules_exists = self._dir_exists and \
+            os.path.isdir(os.path.join(self.ads_fetch_dir, 'node_modules'))
+        self._base_cmd = self._resolve_command()
+    
+    def _resolve_command(self) -> list:
+        """
+        Turn the configured node_script into the command list to execute
+        
+        Returns:
+            Command and arguments for subprocess
+        """
+        if self.node_script == 'npm start' or self.node_script == 'npm run start':
+            # Check if we have a start script
+            package_json_path = os.path.join(self.ads_fetch_dir, 'package.json')
+            try:
+                with open(package_json_path, 'r') as f:
+                    package_data = json.load(f)
+                
+                if 'scripts' in package_data and 'start' in package_data['scripts']:
+                    cmd = ['npm', 'run', 'start']
+                else:
+                    # Try to run the main file directly
+                    main_file = package_data.get('main', 'dist/index.js')
+                    cmd = ['node', main_file]
+            except (OSError, ValueError):
+                cmd = ['npm', 'start']
+                
+        elif self.node_script.startswith('node '):
+            cmd = ['node', self.node_script.replace('node ', '', 1)]
+        elif self.node_script.startswith('ts-node '):
+            cmd = ['ts-node', self.node_script.replace('ts-node ', '', 1)]
+        elif self.node_script.startswith('npm run '):
+            cmd = ['npm', 'run', self.node_script.replace('npm run ', '', 1)]
+        else:
+            cmd = self.node_script.split()
+        
+        return cmd
+    
+    def _acquire_worker(self) -> Optional[NodeWorker]:
+        """
+        Get the long-lived Node.js worker, starting it if needed
+        
+        Returns:
+            The worker with its lock held, or None if it is disabled, keeps
+            failing, could not start, or is busy with another fetch
+        """
+        if not self.worker_script:
+            return None
+        
+        with self._worker_lock:
+            if self._worker_failures >= self.WORKER_MAX_FAILURES:
+                return None
+            
+            if self._worker is None or not self._worker.is_alive():
+                try:
+                    env = {**os.environ, 'PYTHON_CALL': 'true', 'NODE_ENV': 'production'}
+                    self._worker = NodeWorker(self.worker_script.split(), self.ads_fetch_dir, env)
+                    _log.info("Started Node.js worker (pid %s)", self._worker.process.pid)
+                except OSError as e:
+                    self._worker = None
+                    self._record_worker_failure(f"could not start: {e}")
+                    return None
+            worker = self._worker
+        
+        if worker.lock.acquire(blocking=False):
+            return worker
+        return None
+    
+    def _record_worker_failure(self, reason: str):
+        """
+        Count a worker failure; the caller falls back to a one-shot process
+        
+        Must be called with self._worker_lock held.
+        """
+        self._worker_failures += 1
+        if self._worker_failures >= self.WORKER_MAX_FAILURES:
+            _log.warning("Node.js worker failed %s times in a row (%s); "
+                         "using one-shot processes from now on", self._worker_failures, reason)
+        else:
+            _log.warning("Node.js worker unavailable (%s); using a one-shot process", reason)
+    
+    def _format_logs(self, user_id: str, platform: str, start_time: float, elapsed_time: float,
+                     returncode: int, stdout: str, stderr: str) -> str:
+        """Build the log blob stored with the job"""
+        logs = f"=== REAL Ads Fetching Results ===\n"
+        logs += f"User ID: {user_id}\n"
+        logs += f"Platform: {platform}\n"
+        logs += f"Start Time: {datetime.fromtimestamp(start_time)}\n"
+        logs += f"Elapsed Time: {elapsed_time:.2f} seconds\n"
+        logs += f"Return Code: {returncode}\n"
+        logs += f"\n=== STDOUT ===\n{stdout}\n"
+        
+        if stderr:
+            logs += f"\n=== STDERR ===\n{stderr}\n"
+        
+        return logs
     
     def verify_environment(self) -> Tuple[bool, str]:
         """
@@ -76,50 +462,75 @@ class AdsFetcher:
             Tuple of (success, message)
         """
         try:
-            # Check if directory exists
-            if not os.path.exists(self.ads_fetch_dir):
+            # Check if directory exists (cached, see refresh())
+            if not self._dir_exists:
                 return False, f"Ads fetch directory not found: {self.ads_fetch_dir}"
             
             # Check for package.json
-            package_json = os.path.join(self.ads_fetch_dir, 'package.json')
-            if not os.path.exists(package_json):
+            if not self._package_json_exists:
                 return False, f"package.json not found in {self.ads_fetch_dir}"
             
             # Check if node_modules exists (optional but recommended)
-            node_modules = os.path.join(self.ads_fetch_dir, 'node_modules')
-            if not os.path.exists(node_modules):
-                print(f"⚠️  node_modules not found. Run 'npm install' in {self.ads_fetch_dir}")
+            if not self._node_modules_exists:
+                _log.warning("node_modules not found. Run 'npm install' in %s", self.ads_fetch_dir)
+            
+            # Check Node.js and npm availability (cached after first success)
+            tools_ok, tools_message, _, _ = self._probe_node_versions()
+            if not tools_ok:
+                return False, tools_message
+            
+            return True, "Environment verification passed"
+            
+        except Exception as e:
+            return False, f"Environment verification failed: {str(e)}"
+    
+    @classmethod
+    def _probe_node_versions(cls) -> Tuple[bool, str, str, str]:
+        """
+        Probe Node.js and npm versions, caching the first successful result
+        
+        Returns:
+            Tuple of (success, message, node_version, npm_version)
+        """
+        if cls._env_cache is not None:
+            return cls._env_cache
+        
+        with cls._env_lock:
+            # Another thread may have finished probing while we waited
+            if cls._env_cache is not None:
+                return cls._env_cache
+            
+            node_path = shutil.which('node')
+            if not node_path:
+                return False, "Node.js is not installed", "Unknown", "Unknown"
+            
+            npm_path = shutil.which('npm')
+            if not npm_path:
+                return False, "npm is not installed", "Unknown", "Unknown"
             
-            # Check Node.js availability
             try:
-                result = subprocess.run(['node', '--version'], 
+                result = subprocess.run([node_path, '--version'], 
                                       capture_output=True, 
                                       text=True, 
-                                      timeout=5,
-                                      cwd=self.ads_fetch_dir)
+                                      timeout=5)
                 if result.returncode != 0:
-                    return False, "Node.js is not properly installed"
-                print(f"✅ Node.js version: {result.stdout.strip()}")
-            except FileNotFoundError:
-                return False, "Node.js is not installed"
-            
-            # Check npm availability
-            try:
-                result = subprocess.run(['npm', '--version'], 
+                    return False, "Node.js is not properly installed", "Unknown", "Unknown"
+                node_version = result.stdout.strip()
+                _log.info("Node.js version: %s", node_version)
+                
+                result = subprocess.run([npm_path, '--version'], 
                                       capture_output=True, 
                                       text=True, 
-                                      timeout=5,
-                                      cwd=self.ads_fetch_dir)
+                                      timeout=5)
                 if result.returncode != 0:
-                    return False, "npm is not properly installed"
-                print(f"✅ npm version: {result.stdout.strip()}")
-            except FileNotFoundError:
-                return False, "npm is not installed"
-            
-            return True, "Environment verification passed"
+                    return False, "npm is not properly installed", node_version, "Unknown"
+                npm_version = result.stdout.strip()
+                _log.info("npm version: %s", npm_version)
+            except (OSError, subprocess.SubprocessError) as e:
+                return False, f"Node.js/npm check failed: {str(e)}", "Unknown", "Unknown"
             
-        except Exception as e:
-            return False, f"Environment verification failed: {str(e)}"
+            cls._env_cache = (True, "ok", node_version, npm_version)
+            return cls._env_cache
     
     def run_for_user(self, user_id: str, platform: str = "all") -> Tuple[bool, str, int]:
         """
@@ -132,115 +543,109 @@ class AdsFetcher:
         Returns:
             Tuple of (success, logs, ads_count)
         """
-        print(f"🚀 Starting REAL ads fetch for user {user_id} on platform {platform}")
+        _log.info("Starting REAL ads fetch for user %s on platform %s", user_id, platform)
         
         # Verify environment first
         env_ok, env_message = self.verify_environment()
         if not env_ok:
             error_msg = f"Environment check failed: {env_message}"
-            print(f"❌ {error_msg}")
+            _log.error(error_msg)
             return False, error_msg, 0
         
-        # Save original directory
-        original_dir = os.getcwd()
-        
         try:
-            # Change to ads fetch directory
-            os.chdir(self.ads_fetch_dir)
-            print(f"📁 Changed to directory: {os.getcwd()}")
+            # Node.js runs with cwd=self.ads_fetch_dir; the process-wide
+            # working directory is left alone so concurrent fetches are safe
+            _log.debug("Working directory: %s", self.ads_fetch_dir)
             
             # Prepare environment variables for Node.js
-            env = os.environ.copy()
-            env['USER_ID'] = user_id
-            env['PLATFORM'] = platform
-            env['PYTHON_CALL'] = 'true'
-            env['NODE_ENV'] = 'production'  # Set production mode
-            
-            # Determine command to run
-            if self.node_script == 'npm start' or self.node_script == 'npm run start':
-                # Check if we have a start script
-                package_json_path = os.path.join(self.ads_fetch_dir, 'package.json')
-                if os.path.exists(package_json_path):
-                    with open(package_json_path, 'r') as f:
-                        package_data = json.load(f)
-                    
-                    if 'scripts' in package_data and 'start' in package_data['scripts']:
-                        cmd = ['npm', 'run', 'start']
-                    else:
-                        # Try to run the main file directly
-                        main_file = package_data.get('main', 'dist/index.js')
-                        cmd = ['node', main_file]
-                else:
-                    cmd = ['npm', 'start']
-                    
-            elif self.node_script.startswith('node '):
-                cmd = ['node', self.node_script.replace('node ', '', 1)]
-            elif self.node_script.startswith('ts-node '):
-                cmd = ['ts-node', self.node_script.replace('ts-node ', '', 1)]
-            elif self.node_script.startswith('npm run '):
-                cmd = ['npm', 'run', self.node_script.replace('npm run ', '', 1)]
-            else:
-                cmd = self.node_script.split()
+            env = {
+                **os.environ,
+                'USER_ID': user_id,
+                'PLATFORM': platform,
+                'PYTHON_CALL': 'true',
+                'NODE_ENV': 'production'  # Set production mode
+            }
+            
+            cmd = self._base_cmd
             
-            print(f"🔧 Running command: {' '.join(cmd)}")
-            print(f"⚙️  Environment: USER_ID={user_id}, PLATFORM={platform}")
-            print(f"⏱️  Timeout: {self.timeout}s")
+            _log.debug("Environment: USER_ID=%s, PLATFORM=%s, timeout=%ss",
+                       user_id, platform, self.timeout)
             
             # Run the command with timeout
             start_time = time.time()
             
-            result = subprocess.run(
+            worker = self._acquire_worker()
+            if worker is not None:
+                _log.debug("Dispatching to Node.js worker: %s", self.worker_script)
+                result = None
+                try:
+                    result = worker.run_job(user_id, platform, self.timeout)
+                except WorkerUnavailable as e:
+                    with self._worker_lock:
+                        self._record_worker_failure(str(e).splitlines()[0])
+                finally:
+                    worker.lock.release()
+                
+                if result is not None:
+                    with self._worker_lock:
+                        self._worker_failures = 0
+                    
+                    success, stdout, ads_count = result
+                    elapsed_time = time.time() - start_time
+                    logs = self._format_logs(user_id, platform, start_time, elapsed_time,
+                                             0 if success else 1, stdout, '')
+                    if not success:
+                        ads_count = 0
+                    
+                    _log.info("REAL ads fetch completed in %.2fs (success=%s, ads=%s)",
+                              elapsed_time, success, ads_count)
+                    
+                    return success, logs, ads_count
+                
+                # The worker died without a result: run this fetch one-shot instead
+                start_time = time.time()
+            
+            # Worker disabled, busy or broken: run a one-shot Node.js process
+            _log.debug("Running command: %s", cmd)
+            
+            with subprocess.Popen(
                 cmd,
-                capture_output=True,
-                text=True,
-                timeout=self.timeout,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
                 env=env,
-                cwd=self.ads_fetch_dir
-            )
+                cwd=self.ads_fetch_dir,
+                close_fds=True,
+                # Own session: a Ctrl-C aimed at the API doesn't hit Node
+                # mid-fetch, and a timeout can kill npm and its children
+                start_new_session=True
+            ) as process:
+                # Stream raw output; the ads count comes from Node's result line
+                raw_stdout, raw_stderr, reported_ads_count = stream_process(process, self.timeout)
             
-            elapsed_time = time.time() - start_time
+            # Decode once, only for the log blob and the fallback heuristics
+            stdout = raw_stdout.decode('utf-8', 'replace')
+            stderr = raw_stderr.decode('utf-8', 'replace')
             
-            # Parse output
-            stdout = result.stdout
-            stderr = result.stderr
-            returncode = result.returncode
+            elapsed_time = time.time() - start_time
+            returncode = process.returncode
             
             # Combine logs
-            logs = f"=== REAL Ads Fetching Results ===\n"
-            logs += f"User ID: {user_id}\n"
-            logs += f"Platform: {platform}\n"
-            logs += f"Start Time: {datetime.fromtimestamp(start_time)}\n"
-            logs += f"Elapsed Time: {elapsed_time:.2f} seconds\n"
-            logs += f"Return Code: {returncode}\n"
-            logs += f"\n=== STDOUT ===\n{stdout}\n"
-            
-            if stderr:
-                logs += f"\n=== STDERR ===\n{stderr}\n"
+            logs = self._format_logs(user_id, platform, start_time, elapsed_time,
+                                     returncode, stdout, stderr)
             
             # Parse ads count from output
             ads_count = 0
             success = returncode == 0
             
-            if success:
-                # Try to extract ads count from Node.js output
-                patterns = [
-                    r'fetched\s+(\d+)\s+ads',
-                    r'ads_fetched[:\s]+(\d+)',
-                    r'Found\s+(\d+)\s+ads',
-                    r'Total ads:\s*(\d+)',
-                    r'saved\s+(\d+)\s+ads',
-                    r'processed\s+(\d+)\s+ads'
-                ]
+            if success and reported_ads_count is not None:
+                # Node.js reported the count itself; trust it, even when it is 0
+                ads_count = reported_ads_count
+            elif success:
+                # Older builds without the sentinel: scan the output for a count
+                ads_count = scan_ads_count(raw_stdout, raw_stderr)
                 
-                for pattern in patterns:
-                    matches = re.findall(pattern, stdout + stderr, re.IGNORECASE)
-                    if matches:
-                        try:
-                            ads_count = max([int(m) for m in matches])
-                            print(f"📊 Extracted ads count: {ads_count} (pattern: {pattern})")
-                            break
-                        except:
-                            continue
+                if ads_count:
+                    _log.debug("Extracted ads count: %s", ads_count)
                 
                 # If no pattern found, estimate based on output length
                 if ads_count == 0:
@@ -251,36 +656,42 @@ class AdsFetcher:
                             data = json.loads(stdout[stdout.find('['):stdout.rfind(']')+1])
                             if isinstance(data, list):
                                 ads_count = len(data)
-                                print(f"📊 Parsed {ads_count} ads from JSON array")
+                                _log.debug("Parsed %s ads from JSON array", ads_count)
                         except:
                             pass
                 
                 if ads_count == 0 and ('ad' in stdout.lower() or 'advertisement' in stdout.lower()):
                     # Very rough estimate
                     ads_count = min(50, stdout.count('ad ') + stdout.count('Ad ') + stdout.count('"ad"'))
-                    print(f"📊 Estimated ads count: {ads_count}")
+                    _log.debug("Estimated ads count: %s", ads_count)
             
-            print(f"✅ REAL ads fetch completed in {elapsed_time:.2f}s")
-            print(f"   Success: {success}, Real ads count: {ads_count}")
+            _log.info("REAL ads fetch completed in %.2fs (success=%s, ads=%s)",
+                      elapsed_time, success, ads_count)
             
             return success, logs, ads_count
             
         except subprocess.TimeoutExpired:
             error_msg = f"Ads fetching timed out after {self.timeout} seconds"
-            print(f"❌ {error_msg}")
+            _log.error(error_msg)
             return False, error_msg, 0
             
         except Exception as e:
             error_msg = f"Error running ads fetcher: {str(e)}"
-            print(f"❌ {error_msg}")
-            import traceback
-            traceback.print_exc()
+            _log.exception(error_msg)
             return False, error_msg, 0
+    
+    def run_for_user_async(self, user_id: str, platform: str = "all") -> Future:
+        """
+        Run ads fetching for a user on the shared fetch thread pool
+        
+        Args:
+            user_id: The user ID to fetch ads for
+            platform: Which platform to fetch from ('meta', 'google', 'linkedin', 'tiktok', 'all')
             
-        finally:
-            # Always return to original directory
-            os.chdir(original_dir)
-            print(f"📁 Returned to directory: {os.getcwd()}")
+        Returns:
+            Future resolving to the run_for_user tuple (success, logs, ads_count)
+        """
+        return _fetch_executor.submit(self.run_for_user, user_id, platform)
     
     def test_connection(self) -> Dict[str, Any]:
         """
@@ -289,43 +700,19 @@ class AdsFetcher:
         Returns:
             Dictionary with test results
         """
-        print("🧪 Testing Node.js environment...")
+        _log.debug("Testing Node.js environment")
         
         env_ok, env_message = self.verify_environment()
         
-        # Try to run a simple Node.js command
-        node_version = "Unknown"
-        npm_version = "Unknown"
-        
-        try:
-            # Get Node.js version
-            result = subprocess.run(['node', '--version'], 
-                                  capture_output=True, 
-                                  text=True, 
-                                  timeout=5)
-            if result.returncode == 0:
-                node_version = result.stdout.strip()
-        except Exception as e:
-            print(f"❌ Node.js check failed: {e}")
-        
-        try:
-            # Get npm version
-            result = subprocess.run(['npm', '--version'], 
-                                  capture_output=True, 
-                                  text=True, 
-                                  timeout=5)
-            if result.returncode == 0:
-                npm_version = result.stdout.strip()
-        except Exception as e:
-            print(f"❌ npm check failed: {e}")
+        # Reuse the cached version probe instead of spawning node/npm again
+        _, _, node_version, npm_version = self._probe_node_versions()
         
         # Check for package.json and read its contents
-        package_json_exists = False
+        package_json_exists = self._package_json_exists
         package_info = {}
         package_json_path = os.path.join(self.ads_fetch_dir, 'package.json')
         
-        if os.path.exists(package_json_path):
-            package_json_exists = True
+        if package_json_exists:
             try:
                 with open(package_json_path, 'r') as f:
                     package_data = json.load(f)
@@ -358,7 +745,7 @@ class AdsFetcher:
             'npm_version': npm_version,
             'typescript_installed': typescript_installed,
             'ads_fetch_dir': self.ads_fetch_dir,
-            'ads_fetch_dir_exists': os.path.exists(self.ads_fetch_dir),
+            'ads_fetch_dir_exists': self._dir_exists,
             'package_json_exists': package_json_exists,
             'package_info': package_info,
             'timeout_seconds': self.timeout,
@@ -371,6 +758,8 @@ class AdsFetcher:
 ads_fetcher = AdsFetcher()
 
 if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s %(message)s')
+    
     # Test the ads fetcher
     print("🧪 Testing Ads Fetcher...")
     print("=" * 60)
@@ -1,11 +1,24 @@
 """
 DEBUG Ads Fetcher - Extra logging
 """
+import logging
 import os
 import subprocess
 import time
 from datetime import datetime
 
+try:
+    from .ads_fetcher import stream_process
+except ImportError:
+    from ads_fetcher import stream_process
+
+_log = logging.getLogger(__name__)
+
+def _log_node_line(line: bytes):
+    # Only attached as a line callback when DEBUG is on, so the decode
+    # and formatting never run on the normal path
+    _log.debug("NODE: %s", line.decode('utf-8', 'replace').rstrip())
+
 class AdsFetcherDebug:
     def __init__(self):
         self.ads_fetch_dir = os.path.join(
@@ -15,65 +28,54 @@ class AdsFetcherDebug:
         self.timeout = 300
     
     def run_for_user(self, user_id, platform="all"):
-        print(f"🔍 DEBUG: Starting for user {user_id}")
-        print(f"📁 Directory: {self.ads_fetch_dir}")
-        print(f"📁 Exists: {os.path.exists(self.ads_fetch_dir)}")
+        _log.debug("Starting for user %s", user_id)
+        _log.debug("Directory: %s (exists: %s)", self.ads_fetch_dir, os.path.exists(self.ads_fetch_dir))
         
         if not os.path.exists(self.ads_fetch_dir):
             return False, "Directory not found", 0
         
         # Check if we can run npm
         try:
-            original_dir = os.getcwd()
-            os.chdir(self.ads_fetch_dir)
-            print(f"📁 Changed to: {os.getcwd()}")
-            
             # Check package.json
-            if not os.path.exists('package.json'):
+            if not os.path.exists(os.path.join(self.ads_fetch_dir, 'package.json')):
                 return False, "No package.json", 0
             
             # Set environment
-            env = os.environ.copy()
-            env['USER_ID'] = user_id
-            env['PLATFORM'] = platform
+            env = {**os.environ, 'USER_ID': user_id, 'PLATFORM': platform}
             
-            print(f"🚀 DEBUG: Running npm start with USER_ID={user_id}")
-            print(f"⚙️  Command: npm start")
+            _log.debug("Running npm start with USER_ID=%s", user_id)
             
             # Run with more visibility
-            process = subprocess.Popen(
+            with subprocess.Popen(
                 ['npm', 'start'],
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
-                text=True,
-                env=env
-            )
-            
-            # Read output in real-time
-            output_lines = []
-            for line in iter(process.stdout.readline, ''):
-                print(f"📝 NODE: {line.strip()}")
-                output_lines.append(line)
+                env=env,
+                cwd=self.ads_fetch_dir,
+                start_new_session=True
+            ) as process:
+                # Drain stdout and stderr together so a chatty stderr can't
+                # fill its pipe and deadlock the child
+                on_line = _log_node_line if _log.isEnabledFor(logging.DEBUG) else None
+                raw_stdout, raw_stderr, _ = stream_process(process, self.timeout, on_line)
             
-            process.wait()
-            stdout = ''.join(output_lines)
-            stderr = process.stderr.read() if process.stderr else ""
+            stdout = raw_stdout.decode('utf-8', 'replace')
+            stderr = raw_stderr.decode('utf-8', 'replace')
             
-            print(f"📊 DEBUG: Process exited with code {process.returncode}")
+            _log.debug("Process exited with code %s", process.returncode)
             
             if stderr:
-                print(f"❌ ERRORS: {stderr}")
+                _log.error("Node.js errors: %s", stderr)
             
             return process.returncode == 0, stdout + stderr, 0
             
         except Exception as e:
-            print(f"💥 DEBUG Exception: {e}")
+            _log.exception("Debug fetch failed: %s", e)
             return False, str(e), 0
-        finally:
-            os.chdir(original_dir)
 
 # Test it
 if __name__ == '__main__':
+    logging.basicConfig(level=logging.DEBUG, format='%(levelname)s %(message)s')
     print("🧪 DEBUG TEST")
     fetcher = AdsFetcherDebug()
     success, logs, count = fetcher.run_for_user("test-user")
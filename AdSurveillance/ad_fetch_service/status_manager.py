@@ -1,11 +1,14 @@
 """
 Status Manager - Tracks and manages ads fetching job status
 """
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+import atexit
 import threading
 import time
 from typing import Dict, Any, Optional, List
 from supabase import create_client, Client
+import httpx
 import os
 import sys
 
@@ -13,24 +16,181 @@ import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config import Config
 
+# Connection pool shared by every StatusManager caller
+HTTP_POOL_LIMITS = httpx.Limits(max_connections=64, max_keepalive_connections=32)
+
+def init_supabase() -> Optional[Client]:
+    """Create the shared Supabase client with a pooled keep-alive HTTP session"""
+    try:
+        client = create_client(Config.SUPABASE_URL, Config.SUPABASE_KEY)
+    except Exception as e:
+        print(f"❌ StatusManager: Supabase connection failed: {e}")
+        return None
+    
+    # Swap PostgREST's default session for one with a larger pool so
+    # concurrent request handlers don't queue for a connection
+    try:
+        postgrest = client.postgrest
+        default_session = postgrest.session
+        postgrest.session = httpx.Client(
+            base_url=default_session.base_url,
+            headers=default_session.headers,
+            timeout=default_session.timeout,
+            follow_redirects=True,
+            limits=HTTP_POOL_LIMITS
+        )
+        default_session.close()
+    except Exception as e:
+        print(f"⚠️  StatusManager: Using default HTTP pool: {e}")
+    
+    print("✅ StatusManager: Supabase connection established")
+    return client
+
+# Module-level client, created once and shared by all StatusManager instances
+_SB: Optional[Client] = init_supabase()
+
+@lru_cache(maxsize=1024)
+def _parse_iso_timestamp(timestamp: str) -> Optional[datetime]:
+    """
+    Parse an ISO-8601 string to a UTC-aware datetime, memoized
+    
+    The single parser behind StatusManager.parse_timestamp; job rows are
+    re-rendered often with the same timestamps, and datetimes are immutable
+    so cached results can be shared.
+    
+    Returns:
+        The parsed datetime (naive times are taken as UTC), or None if invalid
+    """
+    try:
+        # Handle ISO format timestamps with or without timezone
+        if timestamp[-1] == 'Z':
+            timestamp = timestamp[:-1] + '+00:00'
+        dt = datetime.fromisoformat(timestamp)
+    except (IndexError, ValueError):
+        return None
+    
+    # If datetime is naive (no timezone), make it UTC
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt
+
 class StatusManager:
     """Manages status of ads fetching jobs"""
     
+    # Seconds between background flushes of coalesced progress updates
+    FLUSH_INTERVAL = 0.25
+    
+    # Statuses written synchronously so the final state is never reordered
+    TERMINAL_STATUSES = ('completed', 'failed')
+    
+    # Unknown job IDs are remembered briefly so polling loops don't hammer
+    # the database; short enough that a newly created job shows up quickly
+    MISSING_JOB_TTL = 0.5
+    MISSING_JOB_CACHE_SIZE = 4096
+    
     def __init__(self):
-        try:
-            self.supabase: Client = create_client(Config.SUPABASE_URL, Config.SUPABASE_KEY)
-            print("✅ StatusManager: Supabase connection established")
-        except Exception as e:
-            print(f"❌ StatusManager: Supabase connection failed: {e}")
-            self.supabase = None
-            
+        self.supabase: Optional[Client] = _SB
+        
         self.active_jobs: Dict[str, Dict] = {}
-        self.lock = threading.Lock()
+        self.lock = threading.RLock()
+        
+        # job_id -> monotonic expiry of a cached "not found" lookup
+        self._missing_jobs: Dict[str, float] = {}
+        
+        # Progress updates waiting for the background flusher, merged per job
+        self._pending: Dict[str, Dict] = {}
+        # Serializes database writes so a flush can't land after a terminal update
+        self._write_lock = threading.Lock()
+        
+        # Set on shutdown to stop the flusher
+        self._stop_event = threading.Event()
+        
+        if self.supabase:
+            self._flush_thread = threading.Thread(target=self._flusher, daemon=True)
+            self._flush_thread.start()
+            # The flusher is a daemon thread, so write whatever is still
+            # queued before the interpreter exits
+            atexit.register(self.close)
+    
+    def _flusher(self):
+        """Background loop that periodically writes coalesced progress updates"""
+        while not self._stop_event.wait(self.FLUSH_INTERVAL):
+            self.flush_pending()
+    
+    def close(self):
+        """Stop the background flusher and write any queued updates"""
+        self._stop_event.set()
+        self.flush_pending()
+    
+    def flush_pending(self) -> int:
+        """
+        Write all queued progress updates to the database
+        
+        Updates that fail to write are queued again (under any newer values
+        queued meanwhile) and retried on the next flush.
+        
+        Returns:
+            Number of jobs written
+        """
+        with self._write_lock:
+            with self.lock:
+                if not self._pending:
+                    return 0
+                pending, self._pending = self._pending, {}
+            
+            written = 0
+            for job_id, update_data in pending.items():
+                try:
+                    response = self._write_job_update(job_id, update_data)
+                except Exception as e:
+                    print(f"❌ StatusManager: Error flushing update for job {job_id}: {e}")
+                    with self.lock:
+                        update_data.update(self._pending.get(job_id, {}))
+                        self._pending[job_id] = update_data
+                    continue
+                
+                self._cache_written_job(job_id, response)
+                written += 1
+            
+            return written
+    
+    def _jobs(self):
+        """Query builder for the ads_fetch_jobs table"""
+        return self.supabase.table(Config.DB_TABLES['ads_fetch_jobs'])
+    
+    def _write_job_update(self, job_id: str, update_data: Dict[str, Any]):
+        """Send a single job update to the database, returning the updated row"""
+        return self._jobs()\
+            .update(update_data, returning='representation')\
+            .eq('job_id', job_id)\
+            .execute()
+    
+    def _cache_job_row(self, job_id: str, row: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Cache a row read from or returned by the database
+        
+        Updates still queued for the job are newer than the row, so they
+        are applied on top of it. Must be called with self.lock held.
+        """
+        job_data = {**row, **self._pending.get(job_id, {})}
+        self._missing_jobs.pop(job_id, None)
+        self.active_jobs[job_id] = job_data
+        return job_data
+    
+    def _cache_written_job(self, job_id: str, response):
+        """Cache the row returned by an update"""
+        if response is not None and response.data:
+            with self.lock:
+                self._cache_job_row(job_id, response.data[0])
     
     def update_job_status(self, job_id: str, status: str, **kwargs) -> bool:
         """
         Update job status in database
         
+        Progress updates are queued and written by the background flusher,
+        keeping only the latest values per job. Terminal statuses (completed,
+        failed) are merged with anything still queued and written immediately.
+        
         Args:
             job_id: The job ID
             status: New status (pending, running, completed, failed)
@@ -55,23 +215,36 @@ class StatusManager:
                     update_data[key] = value
             
             # If job is completed or failed, set end_time
-            if status in ['completed', 'failed'] and 'end_time' not in update_data:
+            if status in self.TERMINAL_STATUSES and 'end_time' not in update_data:
                 update_data['end_time'] = datetime.now(timezone.utc).isoformat()
             
-            response = self.supabase.table('ads_fetch_jobs')\
-                .update(update_data)\
-                .eq('job_id', job_id)\
-                .execute()
+            if status in self.TERMINAL_STATUSES:
+                with self._write_lock:
+                    with self.lock:
+                        queued = self._pending.pop(job_id, {})
+                    try:
+                        response = self._write_job_update(job_id, {**queued, **update_data})
+                    except Exception:
+                        # Don't lose progress already reported as saved;
+                        # anything queued since is newer and wins
+                        if queued:
+                            with self.lock:
+                                queued.update(self._pending.get(job_id, {}))
+                                self._pending[job_id] = queued
+                        raise
+                self._cache_written_job(job_id, response)
+            else:
+                with self.lock:
+                    self._pending.setdefault(job_id, {}).update(update_data)
             
-            # Update in-memory cache
+            # Update in-memory cache. Jobs that aren't cached yet are filled
+            # from the row returned by their database write, so no extra
+            # select is needed here.
             with self.lock:
-                if job_id in self.active_jobs:
-                    self.active_jobs[job_id].update(update_data)
-                else:
-                    # Get full job data if not in cache
-                    full_job = self.get_job_status(job_id)
-                    if full_job:
-                        self.active_jobs[job_id] = full_job
+                self._missing_jobs.pop(job_id, None)
+                cached_job = self.active_jobs.get(job_id)
+                if cached_job is not None:
+                    cached_job.update(update_data)
             
             print(f"✅ StatusManager: Updated job {job_id} to status {status}")
             return True
@@ -91,8 +264,17 @@ class StatusManager:
         """
         # Check in-memory cache first
         with self.lock:
-            if job_id in self.active_jobs:
-                return self.active_jobs[job_id].copy()
+            cached_job = self.active_jobs.get(job_id)
+            
+            # Recently looked up and not found
+            expiry = self._missing_jobs.get(job_id)
+            if cached_job is None and expiry is not None:
+                if expiry > time.monotonic():
+                    return None
+                del self._missing_jobs[job_id]
+        
+        if cached_job is not None:
+            return cached_job.copy()
         
         # Fall back to database
         if not self.supabase:
@@ -100,53 +282,48 @@ class StatusManager:
             return None
             
         try:
-            response = self.supabase.table('ads_fetch_jobs')\
+            response = self._jobs()\
                 .select('*')\
                 .eq('job_id', job_id)\
                 .execute()
             
             if response.data:
-                job_data = response.data[0]
-                
-                # Calculate duration if not present
-                if job_data.get('end_time') and job_data.get('start_time'):
-                    start_dt = self.parse_timestamp(job_data['start_time'])
-                    end_dt = self.parse_timestamp(job_data['end_time'])
-                    
-                    if start_dt and end_dt:
-                        job_data['duration_seconds'] = int((end_dt - start_dt).total_seconds())
-                
-                # Update cache
+                # duration_seconds is a generated column, no need to compute it here
                 with self.lock:
-                    self.active_jobs[job_id] = job_data
+                    job_data = self._cache_job_row(job_id, response.data[0])
                 
-                return job_data
+                return job_data.copy()
+            
+            self._remember_missing_job(job_id)
             return None
         except Exception as e:
             print(f"❌ StatusManager: Error getting job {job_id} status: {e}")
             return None
     
+    def _remember_missing_job(self, job_id: str):
+        """Cache a "not found" lookup for MISSING_JOB_TTL seconds"""
+        with self.lock:
+            if len(self._missing_jobs) >= self.MISSING_JOB_CACHE_SIZE:
+                # Drop expired entries, then the oldest if still full
+                now = time.monotonic()
+                self._missing_jobs = {
+                    jid: expiry for jid, expiry in self._missing_jobs.items() if expiry > now
+                }
+                if len(self._missing_jobs) >= self.MISSING_JOB_CACHE_SIZE:
+                    del self._missing_jobs[next(iter(self._missing_jobs))]
+            
+            self._missing_jobs[job_id] = time.monotonic() + self.MISSING_JOB_TTL
+    
     def parse_timestamp(self, timestamp):
         """Parse timestamp string to datetime object with UTC timezone"""
         if not timestamp:
             return None
         
         if isinstance(timestamp, str):
-            try:
-                # Handle ISO format timestamps with or without timezone
-                if timestamp.endswith('Z'):
-                    timestamp = timestamp[:-1] + '+00:00'
-                
-                dt = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
-                
-                # If datetime is naive (no timezone), make it UTC
-                if dt.tzinfo is None:
-                    dt = dt.replace(tzinfo=timezone.utc)
-                
-                return dt
-            except Exception as e:
-                print(f"❌ Error parsing timestamp {timestamp}: {e}")
-                return None
+            dt = _parse_iso_timestamp(timestamp)
+            if dt is None:
+                print(f"❌ Error parsing timestamp {timestamp}")
+            return dt
         elif isinstance(timestamp, datetime):
             # If it's already a datetime object, ensure it has timezone
             if timestamp.tzinfo is None:
@@ -192,12 +369,13 @@ class StatusManager:
                 'updated_at': datetime.now(timezone.utc).isoformat()
             }
             
-            response = self.supabase.table('ads_fetch_jobs')\
+            response = self._jobs()\
                 .insert(job_data)\
                 .execute()
             
             # Add to cache
             with self.lock:
+                self._missing_jobs.pop(job_id, None)
                 self.active_jobs[job_id] = job_data
             
             print(f"✅ StatusManager: Registered new job {job_id} for user {user_id}")
@@ -222,25 +400,15 @@ class StatusManager:
             return []
             
         try:
-            response = self.supabase.table('ads_fetch_jobs')\
+            response = self._jobs()\
                 .select('*')\
                 .eq('user_id', user_id)\
                 .order('created_at', desc=True)\
                 .limit(limit)\
                 .execute()
             
-            jobs = response.data if response.data else []
-            
-            # Calculate durations for each job
-            for job in jobs:
-                if job.get('end_time') and job.get('start_time'):
-                    start_dt = self.parse_timestamp(job['start_time'])
-                    end_dt = self.parse_timestamp(job['end_time'])
-                    
-                    if start_dt and end_dt:
-                        job['duration_seconds'] = int((end_dt - start_dt).total_seconds())
-            
-            return jobs
+            # duration_seconds is a generated column, returned with each row
+            return response.data if response.data else []
         except Exception as e:
             print(f"❌ StatusManager: Error getting jobs for user {user_id}: {e}")
             return []
@@ -261,32 +429,23 @@ class StatusManager:
             
         try:
             # Calculate cutoff date
-            cutoff_date = (datetime.now(timezone.utc) - time.timedelta(days=days_old)).isoformat()
+            cutoff_date = (datetime.now(timezone.utc) - timedelta(days=days_old)).isoformat()
             
             # Delete old jobs
-            response = self.supabase.table('ads_fetch_jobs')\
+            response = self._jobs()\
                 .delete()\
                 .lt('created_at', cutoff_date)\
                 .execute()
             
             deleted_count = len(response.data) if response.data else 0
             
-            # Clean up cache
+            # Clean up cache (ISO-8601 UTC strings compare correctly as text)
             with self.lock:
-                cutoff_timestamp = time.time() - (days_old * 24 * 3600)
-                jobs_to_remove = []
-                
-                for job_id, job_data in self.active_jobs.items():
-                    created_at = job_data.get('created_at')
-                    if isinstance(created_at, str):
-                        created_dt = self.parse_timestamp(created_at)
-                        if created_dt:
-                            created_ts = created_dt.timestamp()
-                            if created_ts < cutoff_timestamp:
-                                jobs_to_remove.append(job_id)
-                
-                for job_id in jobs_to_remove:
-                    del self.active_jobs[job_id]
+                self.active_jobs = {
+                    job_id: job_data
+                    for job_id, job_data in self.active_jobs.items()
+                    if not job_data.get('created_at') or job_data['created_at'] >= cutoff_date
+                }
             
             print(f"✅ StatusManager: Cleaned up {deleted_count} old jobs")
             return deleted_count
@@ -309,44 +468,24 @@ class StatusManager:
             return {}
             
         try:
-            query = self.supabase.table('ads_fetch_jobs').select('*')
+            # Aggregated server-side by get_jobs_stats (see sql/ads_fetch_jobs.sql)
+            response = self.supabase.rpc('get_jobs_stats', {'uid': user_id}).execute()
             
-            if user_id:
-                query = query.eq('user_id', user_id)
-            
-            response = query.execute()
-            jobs = response.data if response.data else []
+            row = response.data or {}
+            if isinstance(row, list):
+                row = row[0] if row else {}
             
             stats = {
-                'total_jobs': len(jobs),
-                'completed': 0,
-                'failed': 0,
-                'running': 0,
-                'pending': 0,
-                'total_ads_fetched': 0,
-                'total_duration_seconds': 0,
-                'avg_duration_seconds': 0
+                'total_jobs': row.get('total') or 0,
+                'completed': row.get('completed') or 0,
+                'failed': row.get('failed') or 0,
+                'running': row.get('running') or 0,
+                'pending': row.get('pending') or 0,
+                'total_ads_fetched': row.get('total_ads') or 0,
+                'total_duration_seconds': row.get('total_duration') or 0,
+                'avg_duration_seconds': row.get('avg_duration') or 0
             }
             
-            total_duration = 0
-            completed_with_duration = 0
-            
-            for job in jobs:
-                status = job.get('status', 'unknown')
-                if status in stats:
-                    stats[status] += 1
-                
-                ads_fetched = job.get('ads_fetched', 0)
-                stats['total_ads_fetched'] += ads_fetched
-                
-                if job.get('duration_seconds'):
-                    total_duration += job['duration_seconds']
-                    completed_with_duration += 1
-            
-            if completed_with_duration > 0:
-                stats['total_duration_seconds'] = total_duration
-                stats['avg_duration_seconds'] = total_duration / completed_with_duration
-            
             return stats
         except Exception as e:
             print(f"❌ StatusManager: Error getting job statistics: {e}")
@@ -368,7 +507,7 @@ class StatusManager:
             return False
             
         try:
-            query = self.supabase.table('ads_fetch_jobs')\
+            query = self._jobs()\
                 .select('id')\
                 .eq('status', 'running')
             
@@ -407,7 +546,8 @@ class StatusManager:
         }
         formatted['status_icon'] = status_icons.get(status, '❓')
         
-        # Format duration
+        # Format duration (only cached jobs that never came from the
+        # database lack the generated duration_seconds column)
         duration = job.get('duration_seconds')
         if not duration and job.get('end_time') and job.get('start_time'):
             start_dt = self.parse_timestamp(job['start_time'])
@@ -439,10 +579,11 @@ class StatusManager:
             # Estimate progress based on time elapsed
             start_time = job.get('start_time')
             if start_time:
+                # Plain epoch arithmetic; the parsed start is memoized across renders
                 start_dt = self.parse_timestamp(start_time)
-                if start_dt:
-                    now = datetime.now(timezone.utc)
-                    elapsed = (now - start_dt).total_seconds()
+                
+                if start_dt is not None:
+                    elapsed = time.time() - start_dt.timestamp()
                     
                     # Estimate total time: 30 seconds per platform per competitor
                     total_competitors = job.get('total_competitors', 1)
@@ -509,10 +650,10 @@ class StatusManager:
             
         try:
             # Calculate cutoff time
-            cutoff_time = (datetime.now(timezone.utc) - time.timedelta(minutes=max_minutes)).isoformat()
+            cutoff_time = (datetime.now(timezone.utc) - timedelta(minutes=max_minutes)).isoformat()
             
             # Find stuck jobs
-            response = self.supabase.table('ads_fetch_jobs')\
+            response = self._jobs()\
                 .select('job_id, start_time')\
                 .eq('status', 'running')\
                 .lt('start_time', cutoff_time)\
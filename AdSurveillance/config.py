@@ -28,12 +28,21 @@ class Config:
     # Node.js command to run (default: 'npm start')
     NODE_SCRIPT = os.getenv('NODE_SCRIPT', 'npm start')
     
+    # Long-lived Node.js worker reused across fetches (empty to disable)
+    NODE_WORKER_SCRIPT = os.getenv('NODE_WORKER_SCRIPT', 'npm run --silent worker')
+    
     # Timeout for ads fetching in seconds (default: 5 minutes)
     ADS_FETCH_TIMEOUT = int(os.getenv('ADS_FETCH_TIMEOUT', 300))
     
     # ========== CORS CONFIG ==========
-    CORS_ORIGINS = os.getenv('CORS_ORIGINS', '*').split(',')
+    CORS_ORIGINS = [origin.strip() for origin in os.getenv('CORS_ORIGINS', '*').split(',') if origin.strip()]
     CORS_SUPPORTS_CREDENTIALS = True
+    CORS_METHODS = ['GET', 'POST', 'PUT', 'DELETE', 'OPTIONS']
+    CORS_ALLOW_HEADERS = ['Content-Type', 'Authorization']
+    # How long browsers may cache a preflight response, in seconds (default: 24 hours)
+    CORS_MAX_AGE = int(os.getenv('CORS_MAX_AGE', 86400))
+    # Preflights asking for a longer Access-Control-Request-Headers are rejected
+    CORS_MAX_REQUEST_HEADERS_LENGTH = 2048
     
     # ========== DATABASE TABLES ==========
     DB_TABLES = {
@@ -54,6 +63,10 @@ class Config:
     ENVIRONMENT = os.getenv('ENVIRONMENT', 'development')
     IS_PRODUCTION = ENVIRONMENT == 'production'
     IS_DEVELOPMENT = ENVIRONMENT == 'development'
+    
+    # ========== LOGGING ==========
+    # Level for the root logger configured in main.py (DEBUG, INFO, WARNING, ...)
+    LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
 
 # Create global instance
 config = Config()
\ No newline at end of file
@@ -1,4 +1,6 @@
+import mmap
 import os
+import re
 import sys
 
 # Path to ads_refresh.py
@@ -6,22 +8,42 @@ ads_refresh_path = 'api/ads_refresh.py'
 
 print("�� FORCE DISABLING MOCK MODE...")
 
+# A file carrying the strict check has already been through this script, so
+# scan the mapped bytes for the marker and stop before reading it into memory
+with open(ads_refresh_path, 'rb') as f:
+    if os.fstat(f.fileno()).st_size:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if mm.find(b'STRICT ADS FETCHER CHECK') != -1:
+                print("✅ ads_refresh.py already patched - nothing to do")
+                sys.exit(0)
+
 with open(ads_refresh_path, 'r') as f:
-    content = f.read()
+    original = content = f.read()
 
 # Remove ALL mock mode references
-replacements = [
-    ('Running in mock mode', 'REAL FETCHING REQUIRED - NO MOCK MODE'),
-    ('mock_mode = True', 'mock_mode = False'),
-    ('"mock": True', '"mock": False'),
-    ('run_mock_fetch', '# run_mock_fetch DISABLED'),
-    ('def run_mock_fetch', '# def run_mock_fetch DISABLED'),
-]
-
-for old, new in replacements:
-    if old in content:
-        content = content.replace(old, new)
-        print(f"✅ Replaced: {old} → {new}")
+replacements = {
+    'Running in mock mode': 'REAL FETCHING REQUIRED - NO MOCK MODE',
+    'mock_mode = True': 'mock_mode = False',
+    '"mock": True': '"mock": False',
+    'run_mock_fetch': '# run_mock_fetch DISABLED',
+    'def run_mock_fetch': '# def run_mock_fetch DISABLED',
+}
+
+# One pass over the file for all replacements. Longer keys come first so
+# 'def run_mock_fetch' wins over the bare 'run_mock_fetch' it contains, and
+# names already marked DISABLED are skipped so a second run changes nothing.
+pattern = re.compile(
+    '(?:' + '|'.join(map(re.escape, sorted(replacements, key=len, reverse=True))) + ')(?! DISABLED)'
+)
+replaced = {}
+
+def replace_match(match):
+    replaced.setdefault(match.group(), replacements[match.group()])
+    return replacements[match.group()]
+
+content = pattern.sub(replace_match, content)
+for old, new in replaced.items():
+    print(f"✅ Replaced: {old} → {new}")
 
 # Also ensure the fetcher check is strict
 strict_check = '''
@@ -33,18 +55,17 @@ if not FETCHER_AVAILABLE:
     # Don't set any fallback - let it fail
 '''
 
-# Add strict check if not present
-if 'STRICT ADS FETCHER CHECK' not in content:
-    # Find where to insert
-    lines = content.split('\n')
-    for i, line in enumerate(lines):
-        if 'FETCHER_AVAILABLE = False' in line:
-            lines.insert(i + 2, strict_check)
-            break
-    content = '\n'.join(lines)
+# Add strict check (known to be absent) right after the flag is initialised
+content = content.replace('FETCHER_AVAILABLE = False\n',
+                          'FETCHER_AVAILABLE = False\n' + strict_check, 1)
+
+# Leave an already patched file alone so its mtime and .pyc stay valid
+if content == original:
+    print("\n✅ ads_refresh.py already patched - nothing to write")
+    sys.exit(0)
 
 with open(ads_refresh_path, 'w') as f:
     f.write(content)
 
 print("\n✅ Mock mode FORCE DISABLED")
-print("🎯 System will now FAIL if ads_fetcher is not available")
+print("🎯 System will now FAIL if ads_fetcher is not available")
\ No newline at end of file
@@ -0,0 +1,63 @@
+-- ============================================================
+-- ads_fetch_jobs - server-side helpers used by StatusManager
+-- Run in the Supabase SQL editor (safe to re-run)
+-- ============================================================
+
+-- Job duration maintained by Postgres so readers never compute it.
+-- StatusManager no longer computes duration_seconds in Python, so a plain
+-- (non-generated) duration_seconds column left over from older deployments
+-- is dropped and re-added as generated; ADD COLUMN IF NOT EXISTS alone would
+-- silently keep the old column and its NULLs. Its values are derived from
+-- start_time/end_time, so nothing is lost.
+DO $$
+BEGIN
+    IF EXISTS (
+        SELECT 1
+        FROM information_schema.columns
+        WHERE table_schema = current_schema()
+          AND table_name = 'ads_fetch_jobs'
+          AND column_name = 'duration_seconds'
+          AND is_generated = 'NEVER'
+    ) THEN
+        RAISE NOTICE 'Replacing plain ads_fetch_jobs.duration_seconds with a generated column';
+        ALTER TABLE ads_fetch_jobs DROP COLUMN duration_seconds;
+    END IF;
+END
+$$;
+
+ALTER TABLE ads_fetch_jobs
+    ADD COLUMN IF NOT EXISTS duration_seconds int
+    GENERATED ALWAYS AS (EXTRACT(EPOCH FROM (end_time - start_time))::int) STORED;
+
+-- Job counters in a single row (StatusManager.get_job_statistics)
+CREATE OR REPLACE FUNCTION get_jobs_stats(uid uuid DEFAULT NULL)
+RETURNS TABLE (
+    total bigint,
+    completed bigint,
+    failed bigint,
+    running bigint,
+    pending bigint,
+    total_ads bigint,
+    total_duration bigint,
+    avg_duration double precision
+)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT
+        COUNT(*),
+        COUNT(*) FILTER (WHERE j.status = 'completed'),
+        COUNT(*) FILTER (WHERE j.status = 'failed'),
+        COUNT(*) FILTER (WHERE j.status = 'running'),
+        COUNT(*) FILTER (WHERE j.status = 'pending'),
+        COALESCE(SUM(j.ads_fetched), 0)::bigint,
+        COALESCE(SUM(j.duration_seconds) FILTER (WHERE j.duration_seconds > 0), 0)::bigint,
+        COALESCE(AVG(j.duration_seconds) FILTER (WHERE j.duration_seconds > 0), 0)::double precision
+    FROM ads_fetch_jobs j
+    WHERE uid IS NULL OR j.user_id = uid;
+$$;
+
+-- Running-job lookups per user (StatusManager.is_job_running, /ads/refresh)
+CREATE INDEX IF NOT EXISTS idx_ads_fetch_jobs_running_user
+    ON ads_fetch_jobs (user_id)
+    WHERE status = 'running';
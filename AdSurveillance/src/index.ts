@@ -2,6 +2,9 @@ import { runAllPlatforms } from './jobs/runAllPlatforms';
 import { runDailySummary } from './jobs/runDailySummary';
 import { generateTargetingIntel } from './jobs/generateTargetingIntel';
 
+// Prefix of the final result line read by ad_fetch_service/ads_fetcher.py
+const RESULT_SENTINEL = '__ADS_RESULT__';
+
 async function validateUserId(userId: string): Promise<boolean> {
   console.log(`🔍 Validating user ID: ${userId}`);
   
@@ -17,6 +20,33 @@ async function validateUserId(userId: string): Promise<boolean> {
   return true;
 }
 
+async function runPipeline(userId: string, platform: string): Promise<number> {
+  // Step 1: Fetch and ingest ads
+  console.log('\n🚀 Step 1: Fetching competitor ads...');
+  const adsCount = await runAllPlatforms(userId, platform);
+  console.log(`✅ Ads fetch completed: ${adsCount} ads found`);
+
+  // Only proceed if ads were found
+  if (adsCount > 0) {
+    // Step 2: Generate daily summary
+    console.log('\n📊 Step 2: Generating daily summary...');
+    await runDailySummary(userId);
+    console.log('✅ Daily summary generated');
+
+    // Step 3: Generate targeting intelligence
+    console.log('\n🧠 Step 3: Generating AI targeting intelligence...');
+    await generateTargetingIntel(userId);
+    console.log('✅ AI insights generated');
+    
+    console.log('\n🎉 Pipeline execution completed successfully!');
+  } else {
+    console.log('\n📭 No ads found for the specified competitors');
+    console.log('💡 The system will show "no data available" on the dashboard');
+  }
+
+  return adsCount;
+}
+
 async function main() {
   console.log('🚀 Starting Ads Intelligence Engine...');
 
@@ -44,28 +74,10 @@ async function main() {
   console.log(`📱 Platform filter: ${platform}`);
 
   try {
-    // Step 1: Fetch and ingest ads
-    console.log('\n🚀 Step 1: Fetching competitor ads...');
-    const adsCount = await runAllPlatforms(targetUserId, platform);
-    console.log(`✅ Ads fetch completed: ${adsCount} ads found`);
-
-    // Only proceed if ads were found
-    if (adsCount > 0) {
-      // Step 2: Generate daily summary
-      console.log('\n📊 Step 2: Generating daily summary...');
-      await runDailySummary(targetUserId);
-      console.log('✅ Daily summary generated');
-
-      // Step 3: Generate targeting intelligence
-      console.log('\n🧠 Step 3: Generating AI targeting intelligence...');
-      await generateTargetingIntel(targetUserId);
-      console.log('✅ AI insights generated');
-      
-      console.log('\n🎉 Pipeline execution completed successfully!');
-    } else {
-      console.log('\n📭 No ads found for the specified competitors');
-      console.log('💡 The system will show "no data available" on the dashboard');
-    }
+    const adsCount = await runPipeline(targetUserId, platform);
+    
+    // Machine-readable result for the Python caller; must be the last stdout line
+    process.stdout.write(`${RESULT_SENTINEL}${JSON.stringify({ count: adsCount })}\n`);
     
     // IMPORTANT: Exit with success code
     process.exit(0);
@@ -83,4 +95,4 @@ if (require.main === module) {
   main();
 }
 
-export { main };
\ No newline at end of file
+export { main, runPipeline, validateUserId };
\ No newline at end of file
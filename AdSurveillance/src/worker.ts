@@ -0,0 +1,69 @@
+import * as readline from 'readline';
+import { runPipeline, validateUserId } from './index';
+
+// Prefix marking protocol lines on stdout; everything else is log output
+const RESULT_PREFIX = '__ADS_WORKER__';
+
+interface WorkerJob {
+  job_id: string;
+  user_id: string;
+  platform?: string;
+}
+
+function emitResult(result: Record<string, unknown>): void {
+  process.stdout.write(`${RESULT_PREFIX}${JSON.stringify(result)}\n`);
+}
+
+async function runJob(job: WorkerJob): Promise<void> {
+  const platform = job.platform || 'all';
+  console.log(`🎯 Worker job ${job.job_id}: user ${job.user_id}, platform ${platform}`);
+
+  const isValid = await validateUserId(job.user_id);
+  if (!isValid) {
+    emitResult({ job_id: job.job_id, done: true, ok: false, ads: 0, error: 'Invalid user ID' });
+    return;
+  }
+
+  try {
+    const adsCount = await runPipeline(job.user_id, platform);
+    emitResult({ job_id: job.job_id, done: true, ok: true, ads: adsCount });
+  } catch (error: any) {
+    console.error('❌ Fatal error in worker job:', error.message);
+    console.error('Stack trace:', error.stack);
+    emitResult({ job_id: job.job_id, done: true, ok: false, ads: 0, error: error.message });
+  }
+}
+
+/**
+ * Long-lived worker used by the Python AdsFetcher.
+ * Reads one JSON job per line from stdin and runs them one at a time,
+ * so Node.js/ts-node startup is paid once instead of once per fetch.
+ */
+async function worker() {
+  console.log('🚀 Ads Intelligence worker ready');
+
+  const rl = readline.createInterface({ input: process.stdin, terminal: false });
+
+  for await (const line of rl) {
+    if (!line.trim()) {
+      continue;
+    }
+
+    let job: WorkerJob;
+    try {
+      job = JSON.parse(line);
+    } catch (error: any) {
+      console.error('❌ Invalid job line:', error.message);
+      continue;
+    }
+
+    await runJob(job);
+  }
+
+  // stdin closed: the Python side has gone away
+  process.exit(0);
+}
+
+if (require.main === module) {
+  worker();
+}
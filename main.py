@@ -2,31 +2,154 @@
 AdSurveillance - Unified Flask API
 Main entry point for Railway/Production Deployment
 """
+import importlib
+import io
+import json
+import logging
 import os
 import sys
-from flask import Flask, jsonify
+import time
+from flask import Flask, Response, jsonify
 from flask_cors import CORS
 from datetime import datetime
 
 # Import config
 from config import Config
+from database import is_supabase_connected
 
-# Import blueprints
-from AdSurveillance.api.auth import auth_bp
-from AdSurveillance.api.ads_refresh import ads_refresh_bp
-from AdSurveillance.api.ads_status import ads_status_bp
-from AdSurveillance.api.competitors import competitors_bp
-from AdSurveillance.api.daily_metrics import daily_metrics_bp
-from AdSurveillance.api.targeting_intel import targeting_intel_bp
-from AdSurveillance.api.user_analytics import user_analytics_bp
+# Service modules log through the logging module; without a handler only
+# WARNING and above would reach the Railway logs
+logging.basicConfig(
+    level=getattr(logging, Config.LOG_LEVEL, logging.INFO),
+    format='%(asctime)s %(levelname)s %(name)s: %(message)s'
+)
 
-# Check for main_dashboard blueprint (optional)
-try:
-    from AdSurveillance.api.main_dashboard import main_dashboard_bp
-    HAS_DASHBOARD = True
-except ImportError:
-    HAS_DASHBOARD = False
-    print("⚠️  main_dashboard.py not found - skipping dashboard blueprint")
+# Single registry of API blueprints:
+# (module, attribute, url suffix under Config.API_PREFIX, banner label, optional).
+# Modules are imported inside create_app() so importing this module stays cheap.
+# Entries without a label are nested under another one and aren't listed.
+BLUEPRINTS = (
+    # Authentication
+    ('AdSurveillance.api.auth', 'auth_bp', '/auth', 'Authentication', False),
+    # Ads Management
+    ('AdSurveillance.api.ads_refresh', 'ads_refresh_bp', '/ads', 'Ads Management', False),
+    ('AdSurveillance.api.ads_status', 'ads_status_bp', '/ads/status', None, False),
+    # Competitors
+    ('AdSurveillance.api.competitors', 'competitors_bp', '/competitors', 'Competitors', False),
+    # Analytics & Metrics
+    ('AdSurveillance.api.daily_metrics', 'daily_metrics_bp', '/metrics', 'Metrics', False),
+    ('AdSurveillance.api.user_analytics', 'user_analytics_bp', '/analytics', 'Analytics', False),
+    # Targeting Intelligence
+    ('AdSurveillance.api.targeting_intel', 'targeting_intel_bp', '/targeting', 'Targeting', False),
+    # Dashboard
+    ('AdSurveillance.api.main_dashboard', 'main_dashboard_bp', '/dashboard', 'Dashboard', True),
+)
+
+def register_blueprints(app, prefix):
+    """
+    Import and register every blueprint in BLUEPRINTS
+    
+    Args:
+        app: Flask application
+        prefix: URL prefix the blueprint suffixes are appended to
+    
+    Returns:
+        List of (label, url_prefix) for the registered, labelled blueprints
+    """
+    registered = []
+    for module_path, attr, suffix, label, optional in BLUEPRINTS:
+        try:
+            module = importlib.import_module(module_path)
+        except ImportError:
+            if not optional:
+                raise
+            print(f"⚠️  {module_path.rsplit('.', 1)[-1]}.py not found - skipping {label.lower()} blueprint")
+            continue
+        
+        url_prefix = prefix + suffix
+        app.register_blueprint(getattr(module, attr), url_prefix=url_prefix)
+        if label:
+            registered.append((label, url_prefix))
+    return registered
+
+# (epoch second, ISO string) of the last timestamp handed out by _now_iso()
+_ts_cache = (0, '')
+
+def _now_iso():
+    """
+    Current local time as an ISO string, at one-second resolution
+    
+    The string is rebuilt only when the second changes, so frequent
+    /health probes mostly get the cached value.
+    """
+    global _ts_cache
+    now = int(time.time())
+    cached = _ts_cache
+    if cached[0] != now:
+        cached = _ts_cache = (now, datetime.fromtimestamp(now).isoformat())
+    return cached[1]
+
+def limit_preflight_headers(wsgi_app, max_length):
+    """
+    Wrap a WSGI app so preflights with an oversized header list get a 400
+    
+    The check runs before Flask, so flask-cors never splits the
+    attacker-controlled Access-Control-Request-Headers value.
+    
+    Args:
+        wsgi_app: WSGI application to wrap
+        max_length: Longest Access-Control-Request-Headers value accepted
+    
+    Returns:
+        The wrapped WSGI application
+    """
+    body = json.dumps({
+        'error': 'Bad request',
+        'message': 'Access-Control-Request-Headers is too long',
+        'status': 400
+    }).encode('utf-8')
+    headers = [('Content-Type', 'application/json'), ('Content-Length', str(len(body)))]
+    
+    def guarded_app(environ, start_response):
+        if (environ.get('REQUEST_METHOD') == 'OPTIONS'
+                and len(environ.get('HTTP_ACCESS_CONTROL_REQUEST_HEADERS', '')) > max_length):
+            start_response('400 BAD REQUEST', headers)
+            return [body]
+        return wsgi_app(environ, start_response)
+    
+    return guarded_app
+
+def print_startup_info(blueprints):
+    """
+    Print the startup banner once, when the app is created
+    
+    Supabase is not probed here so startup stays off the network;
+    /health is the place that checks the connection. The banner is built
+    in memory and written to stdout in one go.
+    
+    Args:
+        blueprints: List of (label, url_prefix) from register_blueprints()
+    """
+    buf = io.StringIO()
+    print("\n" + "="*80, file=buf)
+    print("🚀 AD SURVEILLANCE API", file=buf)
+    print("="*80, file=buf)
+    print(f"📦 Version: {Config.API_VERSION}", file=buf)
+    print(f"🌍 Environment: {Config.ENVIRONMENT}", file=buf)
+    print(f"🔧 Debug: {Config.DEBUG}", file=buf)
+    print(f"🔐 Supabase: {'Configured' if Config.SUPABASE_URL and Config.SUPABASE_KEY else 'Not configured'}", file=buf)
+    print(f"🔗 API Prefix: {Config.API_PREFIX}", file=buf)
+    print("\n📋 Registered Blueprints:", file=buf)
+    for label, url_prefix in blueprints:
+        print(f"  • {label}: {url_prefix}", file=buf)
+    print("\n🌐 Endpoints:", file=buf)
+    print(f"  • Root: /", file=buf)
+    print(f"  • Health: /health", file=buf)
+    print(f"  • API Info: /api", file=buf)
+    print("="*80 + "\n", file=buf)
+    
+    sys.stdout.write(buf.getvalue())
+    sys.stdout.flush()
 
 def create_app():
     """Create and configure the Flask application"""
@@ -40,58 +163,51 @@ def create_app():
     # Enable CORS
     CORS(app, 
          origins=Config.CORS_ORIGINS,
-         supports_credentials=Config.CORS_SUPPORTS_CREDENTIALS)
+         supports_credentials=Config.CORS_SUPPORTS_CREDENTIALS,
+         methods=Config.CORS_METHODS,
+         allow_headers=Config.CORS_ALLOW_HEADERS,
+         max_age=Config.CORS_MAX_AGE)
     
-    # ========== REGISTER BLUEPRINTS ==========
-    # Authentication
-    app.register_blueprint(auth_bp, url_prefix=f'{Config.API_PREFIX}/auth')
-    
-    # Ads Management
-    app.register_blueprint(ads_refresh_bp, url_prefix=f'{Config.API_PREFIX}/ads')
-    app.register_blueprint(ads_status_bp, url_prefix=f'{Config.API_PREFIX}/ads/status')
-    
-    # Competitors
-    app.register_blueprint(competitors_bp, url_prefix=f'{Config.API_PREFIX}/competitors')
-    
-    # Analytics & Metrics
-    app.register_blueprint(daily_metrics_bp, url_prefix=f'{Config.API_PREFIX}/metrics')
-    app.register_blueprint(user_analytics_bp, url_prefix=f'{Config.API_PREFIX}/analytics')
+    # Oversized preflights are refused before flask-cors parses their headers
+    app.wsgi_app = limit_preflight_headers(app.wsgi_app, Config.CORS_MAX_REQUEST_HEADERS_LENGTH)
     
-    # Targeting Intelligence
-    app.register_blueprint(targeting_intel_bp, url_prefix=f'{Config.API_PREFIX}/targeting')
+    # ========== REGISTER BLUEPRINTS ==========
+    prefix = Config.API_PREFIX
+    blueprints = register_blueprints(app, prefix)
     
-    # Dashboard (optional)
-    if HAS_DASHBOARD:
-        app.register_blueprint(main_dashboard_bp, url_prefix=f'{Config.API_PREFIX}/dashboard')
+    # Listed by the root endpoint, e.g. {'auth': '/api/v1/auth', ...}
+    endpoints = {url_prefix[len(prefix) + 1:]: url_prefix for _, url_prefix in blueprints}
+    endpoints['health'] = '/health'
     
     # ========== GLOBAL ENDPOINTS ==========
+    # Everything in the root response except the timestamp is fixed once the
+    # app is built, so it is serialized here and only the timestamp is spliced in
+    root_info = json.dumps({
+        'service': 'AdSurveillance API',
+        'version': Config.API_VERSION,
+        'status': 'running',
+        'environment': Config.ENVIRONMENT,
+        'endpoints': endpoints
+    })
+    root_json_prefix = root_info[:-1] + ', "timestamp": "'
+    root_headers = {'Cache-Control': 'public, max-age=60'}
+    
     @app.route('/')
     def root():
         """Root endpoint with service information"""
-        return jsonify({
-            'service': 'AdSurveillance API',
-            'version': Config.API_VERSION,
-            'status': 'running',
-            'timestamp': datetime.now().isoformat(),
-            'environment': Config.ENVIRONMENT,
-            'endpoints': {
-                'auth': f'{Config.API_PREFIX}/auth',
-                'ads': f'{Config.API_PREFIX}/ads',
-                'competitors': f'{Config.API_PREFIX}/competitors',
-                'metrics': f'{Config.API_PREFIX}/metrics',
-                'analytics': f'{Config.API_PREFIX}/analytics',
-                'targeting': f'{Config.API_PREFIX}/targeting',
-                'health': '/health'
-            }
-        })
+        return Response(root_json_prefix + _now_iso() + '"}',
+                        mimetype='application/json', headers=root_headers)
     
     @app.route('/health')
     def health():
+        # Only checks that the client was created; no network round trip
+        supabase_ok = is_supabase_connected()
         return jsonify({
-            'status': 'healthy',
+            'status': 'healthy' if supabase_ok else 'degraded',
             'service': 'AdSurveillance',
-            'timestamp': datetime.now().isoformat(),
-            'environment': Config.ENVIRONMENT
+            'timestamp': _now_iso(),
+            'environment': Config.ENVIRONMENT,
+            'supabase': 'connected' if supabase_ok else 'disconnected'
         }), 200
 
     
@@ -105,47 +221,33 @@ def create_app():
         })
     
     # ========== ERROR HANDLERS ==========
+    # Error bodies never change, so they are encoded once rather than per error
+    json_headers = {'Content-Type': 'application/json'}
+    not_found_response = (json.dumps({
+        'error': 'Not found',
+        'message': 'The requested endpoint does not exist',
+        'status': 404
+    }).encode('utf-8'), 404, json_headers)
+    internal_error_response = (json.dumps({
+        'error': 'Internal server error',
+        'message': 'An unexpected error occurred',
+        'status': 500
+    }).encode('utf-8'), 500, json_headers)
+    
     @app.errorhandler(404)
     def not_found(error):
-        return jsonify({
-            'error': 'Not found',
-            'message': 'The requested endpoint does not exist',
-            'status': 404
-        }), 404
+        return not_found_response
     
     @app.errorhandler(500)
     def internal_error(error):
-        return jsonify({
-            'error': 'Internal server error',
-            'message': 'An unexpected error occurred',
-            'status': 500
-        }), 500
+        return internal_error_response
+    
+    # Werkzeug only flags the URL map for re-sorting as rules are added; compile
+    # it once now so the first request doesn't pay for it under the remap lock
+    app.url_map.update()
     
     # ========== PRINT STARTUP INFO ==========
-    @app.before_first_request
-    def print_startup_info():
-        print("\n" + "="*80)
-        print("🚀 AD SURVEILLANCE API")
-        print("="*80)
-        print(f"📦 Version: {Config.API_VERSION}")
-        print(f"🌍 Environment: {Config.ENVIRONMENT}")
-        print(f"🔧 Debug: {Config.DEBUG}")
-        print(f"🔐 Supabase: {'Connected' if is_supabase_connected() else 'Not connected'}")
-        print(f"🔗 API Prefix: {Config.API_PREFIX}")
-        print("\n📋 Registered Blueprints:")
-        print(f"  • Authentication: {Config.API_PREFIX}/auth")
-        print(f"  • Ads Management: {Config.API_PREFIX}/ads")
-        print(f"  • Competitors: {Config.API_PREFIX}/competitors")
-        print(f"  • Metrics: {Config.API_PREFIX}/metrics")
-        print(f"  • Analytics: {Config.API_PREFIX}/analytics")
-        print(f"  • Targeting: {Config.API_PREFIX}/targeting")
-        if HAS_DASHBOARD:
-            print(f"  • Dashboard: {Config.API_PREFIX}/dashboard")
-        print("\n🌐 Endpoints:")
-        print(f"  • Root: /")
-        print(f"  • Health: /health")
-        print(f"  • API Info: /api")
-        print("="*80 + "\n")
+    print_startup_info(blueprints)
     
     return app
 